@@ -1,12 +1,29 @@
 import json
 import os
-import jwt
-from datetime import datetime, timedelta
 from typing import Dict, Any
 
 SECRET_KEY = os.environ.get('JWT_SECRET', 'warehouse-secret-key-2024')
 ALGORITHM = 'HS256'
 
+PREFLIGHT_RESPONSE = {
+    'statusCode': 200,
+    'headers': {
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Methods': 'POST, OPTIONS',
+        'Access-Control-Allow-Headers': 'Content-Type',
+        'Access-Control-Max-Age': '86400'
+    },
+    'body': '',
+    'isBase64Encoded': False
+}
+
+METHOD_NOT_ALLOWED_RESPONSE = {
+    'statusCode': 405,
+    'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+    'body': json.dumps({'error': 'Method not allowed'}),
+    'isBase64Encoded': False
+}
+
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     '''
     Business: JWT authentication for warehouse system
@@ -16,31 +33,19 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     method: str = event.get('httpMethod', 'GET')
     
     if method == 'OPTIONS':
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'POST, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type',
-                'Access-Control-Max-Age': '86400'
-            },
-            'body': '',
-            'isBase64Encoded': False
-        }
+        return dict(PREFLIGHT_RESPONSE)
     
     if method != 'POST':
-        return {
-            'statusCode': 405,
-            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({'error': 'Method not allowed'}),
-            'isBase64Encoded': False
-        }
+        return dict(METHOD_NOT_ALLOWED_RESPONSE)
     
     body_data = json.loads(event.get('body', '{}'))
     username = body_data.get('username', '')
     password = body_data.get('password', '')
     
     if username == 'admin' and password == 'admin123':
+        import jwt
+        from datetime import datetime, timedelta
+        
         payload = {
             'sub': username,
             'exp': datetime.utcnow() + timedelta(hours=24),
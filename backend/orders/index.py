@@ -1,128 +1,171 @@
 import json
-from typing import Dict, Any
+from typing import Dict, Any, List
 from datetime import datetime
 
-MOCK_ORDERS = [
-    {
-        'id': 1,
-        'username': 'Иван Петров',
-        'paymentType': 'Card',
-        'comment': 'Срочный заказ',
-        'loyaltyCardNumber': '1234567890',
-        'totalAmount': 214980.00,
-        'status': 'Completed',
-        'createdOnUtc': '2024-10-10T14:30:00',
-        'completedOnUtc': '2024-10-10T15:00:00',
-        'products': [
-            {
-                'productId': 1,
-                'productName': 'Samsung Galaxy S24',
-                'quantity': 1,
-                'unitPrice': 89990.00,
-                'purchasePrice': 75000.00,
-                'totalPrice': 89990.00,
-                'totalPurchasePrice': 75000.00,
-                'profit': 14990.00
-            },
-            {
-                'productId': 2,
-                'productName': 'iPhone 15 Pro',
-                'quantity': 1,
-                'unitPrice': 124990.00,
-                'purchasePrice': 105000.00,
-                'totalPrice': 124990.00,
-                'totalPurchasePrice': 105000.00,
-                'profit': 19990.00
-            }
-        ]
-    },
-    {
-        'id': 2,
-        'username': 'Мария Сидорова',
-        'paymentType': 'Cash',
-        'comment': '',
-        'loyaltyCardNumber': None,
-        'totalAmount': 28980.00,
-        'status': 'Active',
-        'createdOnUtc': '2024-10-12T10:15:00',
-        'completedOnUtc': None,
-        'products': [
-            {
-                'productId': 3,
-                'productName': 'Nike Air Max 270',
-                'quantity': 1,
-                'unitPrice': 12990.00,
-                'purchasePrice': 9000.00,
-                'totalPrice': 12990.00,
-                'totalPurchasePrice': 9000.00,
-                'profit': 3990.00
-            },
-            {
-                'productId': 4,
-                'productName': 'Adidas Ultraboost 22',
-                'quantity': 1,
-                'unitPrice': 15990.00,
-                'purchasePrice': 12000.00,
-                'totalPrice': 15990.00,
-                'totalPurchasePrice': 12000.00,
-                'profit': 3990.00
-            }
-        ]
+PREFLIGHT_RESPONSE = {
+    'statusCode': 200,
+    'headers': {
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+        'Access-Control-Allow-Headers': 'Content-Type, Idempotency-Key',
+        'Access-Control-Max-Age': '86400'
     },
-    {
-        'id': 3,
-        'username': 'Алексей Иванов',
-        'paymentType': 'Transfer',
-        'comment': 'Оптовая закупка',
-        'loyaltyCardNumber': '9876543210',
-        'totalAmount': 4495.00,
-        'status': 'Completed',
-        'createdOnUtc': '2024-10-13T16:20:00',
-        'completedOnUtc': '2024-10-13T17:00:00',
-        'products': [
-            {
-                'productId': 5,
-                'productName': 'Молоко 3.2%',
-                'quantity': 50,
-                'unitPrice': 89.90,
-                'purchasePrice': 65.00,
-                'totalPrice': 4495.00,
-                'totalPurchasePrice': 3250.00,
-                'profit': 1245.00
-            }
-        ]
-    }
-]
+    'body': '',
+    'isBase64Encoded': False
+}
 
-next_order_id = 4
+METHOD_NOT_ALLOWED_RESPONSE = {
+    'statusCode': 405,
+    'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+    'body': json.dumps({'error': 'Method not allowed'}),
+    'isBase64Encoded': False
+}
 
-def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+MOCK_ORDERS: List[Dict[str, Any]] = []
+
+def load_mock_orders() -> List[Dict[str, Any]]:
     '''
-    Business: Manage warehouse orders - create, list, complete, cancel
-    Args: event with httpMethod GET/POST, order data
-    Returns: Order list or order creation confirmation
+    Seeds the in-memory dataset on first use so cold starts and preflights
+    do not pay for building it.
     '''
+    if not MOCK_ORDERS:
+        MOCK_ORDERS.extend(seed_mock_orders())
+    return MOCK_ORDERS
+
+def seed_mock_orders() -> List[Dict[str, Any]]:
+    return [
+        {
+            'id': 1,
+            'username': 'Иван Петров',
+            'paymentType': 'Card',
+            'comment': 'Срочный заказ',
+            'loyaltyCardNumber': '1234567890',
+            'totalAmount': 214980.00,
+            'status': 'Completed',
+            'createdOnUtc': '2024-10-10T14:30:00',
+            'completedOnUtc': '2024-10-10T15:00:00',
+            'modifiedOnUtc': '2024-10-10T15:00:00',
+            'products': [
+                {
+                    'productId': 1,
+                    'productName': 'Samsung Galaxy S24',
+                    'quantity': 1,
+                    'unitPrice': 89990.00,
+                    'purchasePrice': 75000.00,
+                    'totalPrice': 89990.00,
+                    'totalPurchasePrice': 75000.00,
+                    'profit': 14990.00
+                },
+                {
+                    'productId': 2,
+                    'productName': 'iPhone 15 Pro',
+                    'quantity': 1,
+                    'unitPrice': 124990.00,
+                    'purchasePrice': 105000.00,
+                    'totalPrice': 124990.00,
+                    'totalPurchasePrice': 105000.00,
+                    'profit': 19990.00
+                }
+            ]
+        },
+        {
+            'id': 2,
+            'username': 'Мария Сидорова',
+            'paymentType': 'Cash',
+            'comment': '',
+            'loyaltyCardNumber': None,
+            'totalAmount': 28980.00,
+            'status': 'Active',
+            'createdOnUtc': '2024-10-12T10:15:00',
+            'completedOnUtc': None,
+            'modifiedOnUtc': '2024-10-12T10:15:00',
+            'products': [
+                {
+                    'productId': 3,
+                    'productName': 'Nike Air Max 270',
+                    'quantity': 1,
+                    'unitPrice': 12990.00,
+                    'purchasePrice': 9000.00,
+                    'totalPrice': 12990.00,
+                    'totalPurchasePrice': 9000.00,
+                    'profit': 3990.00
+                },
+                {
+                    'productId': 4,
+                    'productName': 'Adidas Ultraboost 22',
+                    'quantity': 1,
+                    'unitPrice': 15990.00,
+                    'purchasePrice': 12000.00,
+                    'totalPrice': 15990.00,
+                    'totalPurchasePrice': 12000.00,
+                    'profit': 3990.00
+                }
+            ]
+        },
+        {
+            'id': 3,
+            'username': 'Алексей Иванов',
+            'paymentType': 'Transfer',
+            'comment': 'Оптовая закупка',
+            'loyaltyCardNumber': '9876543210',
+            'totalAmount': 4495.00,
+            'status': 'Completed',
+            'createdOnUtc': '2024-10-13T16:20:00',
+            'completedOnUtc': '2024-10-13T17:00:00',
+            'modifiedOnUtc': '2024-10-13T17:00:00',
+            'products': [
+                {
+                    'productId': 5,
+                    'productName': 'Молоко 3.2%',
+                    'quantity': 50,
+                    'unitPrice': 89.90,
+                    'purchasePrice': 65.00,
+                    'totalPrice': 4495.00,
+                    'totalPurchasePrice': 3250.00,
+                    'profit': 1245.00
+                }
+            ]
+        }
+    ]
+
+next_order_id = 4
+
+def handle_request(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     global next_order_id
     method: str = event.get('httpMethod', 'GET')
     
     if method == 'OPTIONS':
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type',
-                'Access-Control-Max-Age': '86400'
-            },
-            'body': '',
-            'isBase64Encoded': False
-        }
+        return dict(PREFLIGHT_RESPONSE)
+    
+    if method not in ('GET', 'POST'):
+        return dict(METHOD_NOT_ALLOWED_RESPONSE)
+    
+    load_mock_orders()
     
     if method == 'GET':
         params = event.get('queryStringParameters') or {}
+        since = params.get('since')
         page = int(params.get('page', 1))
         page_size = int(params.get('pageSize', 20))
         
+        sync_token = max((o['modifiedOnUtc'] for o in MOCK_ORDERS), default=since or '')
+        
+        if since:
+            orders = [o for o in MOCK_ORDERS if o['modifiedOnUtc'] > since]
+            
+            result = {
+                'orders': orders,
+                'total': len(orders),
+                'syncToken': sync_token
+            }
+            
+            return {
+                'statusCode': 200,
+                'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                'body': json.dumps(result),
+                'isBase64Encoded': False
+            }
+        
         total = len(MOCK_ORDERS)
         start = (page - 1) * page_size
         end = start + page_size
@@ -133,7 +176,8 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'total': total,
             'page': page,
             'pageSize': page_size,
-            'totalPages': (total + page_size - 1) // page_size
+            'totalPages': (total + page_size - 1) // page_size,
+            'syncToken': sync_token
         }
         
         return {
@@ -153,6 +197,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 if order['id'] == order_id:
                     order['status'] = 'Completed'
                     order['completedOnUtc'] = datetime.utcnow().isoformat()
+                    order['modifiedOnUtc'] = order['completedOnUtc']
                     break
             
             return {
@@ -167,6 +212,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             for order in MOCK_ORDERS:
                 if order['id'] == order_id:
                     order['status'] = 'Cancelled'
+                    order['modifiedOnUtc'] = datetime.utcnow().isoformat()
                     break
             
             return {
@@ -188,6 +234,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 'totalAmount': total_amount,
                 'status': 'Active',
                 'createdOnUtc': datetime.utcnow().isoformat(),
+                'modifiedOnUtc': datetime.utcnow().isoformat(),
                 'completedOnUtc': None,
                 'products': []
             }
@@ -218,9 +265,19 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 'isBase64Encoded': False
             }
     
-    return {
-        'statusCode': 405,
-        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-        'body': json.dumps({'error': 'Method not allowed'}),
-        'isBase64Encoded': False
-    }
+    return dict(METHOD_NOT_ALLOWED_RESPONSE)
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    '''
+    Business: Manage warehouse orders - create, list, complete, cancel
+    Args: event with httpMethod GET/POST, order data
+    Returns: Order list or order creation confirmation
+    '''
+    method: str = event.get('httpMethod', 'GET')
+    
+    if method == 'POST':
+        from idempotency import with_idempotency
+        
+        return with_idempotency(event, 'orders', lambda: handle_request(event, context))
+    
+    return handle_request(event, context)
@@ -0,0 +1,240 @@
+'''
+Idempotency-Key support for mutating handlers: a bounded in-memory response
+cache with TTL, backed by the idempotency_keys table when DATABASE_URL is set
+so retries landing on another container are replayed too.
+'''
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Optional, Tuple
+
+IDEMPOTENCY_TTL_SECONDS = 24 * 60 * 60
+IDEMPOTENCY_MAX_KEYS = 1000
+IDEMPOTENCY_WAIT_SECONDS = 10
+IDEMPOTENCY_FUNCTION_TIMEOUT_SECONDS = 30
+IDEMPOTENCY_LEASE_SECONDS = IDEMPOTENCY_WAIT_SECONDS + IDEMPOTENCY_FUNCTION_TIMEOUT_SECONDS
+
+_responses: 'OrderedDict[str, Tuple[float, str, Dict[str, Any]]]' = OrderedDict()
+_in_flight: Dict[str, threading.Event] = {}
+_lock = threading.Lock()
+
+def get_idempotency_key(event: Dict[str, Any]) -> Optional[str]:
+    headers = event.get('headers') or {}
+    for name, value in headers.items():
+        if name.lower() in ('idempotency-key', 'x-idempotency-key') and value:
+            return value.strip()[:255]
+    return None
+
+def request_fingerprint(event: Dict[str, Any]) -> str:
+    raw = f"{event.get('httpMethod', '')}\n{event.get('body') or ''}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+def replay(response: Dict[str, Any]) -> Dict[str, Any]:
+    replayed = dict(response)
+    replayed['headers'] = {**response.get('headers', {}), 'Idempotent-Replayed': 'true'}
+    return replayed
+
+def error_response(status_code: int, message: str) -> Dict[str, Any]:
+    return {
+        'statusCode': status_code,
+        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+        'body': json.dumps({'error': message}),
+        'isBase64Encoded': False
+    }
+
+def remember(cache_key: str, fingerprint: str, response: Dict[str, Any]) -> None:
+    with _lock:
+        _responses[cache_key] = (time.monotonic() + IDEMPOTENCY_TTL_SECONDS, fingerprint, response)
+        _responses.move_to_end(cache_key)
+        while len(_responses) > IDEMPOTENCY_MAX_KEYS:
+            _responses.popitem(last=False)
+
+def lookup_or_claim(cache_key: str) -> Tuple[Optional[Tuple[str, Dict[str, Any]]], Optional[threading.Event]]:
+    '''
+    Returns the stored (fingerprint, response) if present, otherwise either the
+    Event of an in-flight execution to wait on or None after claiming the key.
+    '''
+    with _lock:
+        stored = _responses.get(cache_key)
+        if stored and stored[0] < time.monotonic():
+            del _responses[cache_key]
+            stored = None
+        if stored:
+            return (stored[1], stored[2]), None
+        if cache_key in _in_flight:
+            return None, _in_flight[cache_key]
+        _in_flight[cache_key] = threading.Event()
+        return None, None
+
+def release(cache_key: str) -> None:
+    with _lock:
+        done = _in_flight.pop(cache_key, None)
+    if done:
+        done.set()
+
+def get_db_connection():
+    dsn = os.environ.get('DATABASE_URL')
+    if not dsn:
+        return None
+    try:
+        import psycopg2
+        conn = psycopg2.connect(dsn, connect_timeout=3)
+        conn.autocommit = True
+        return conn
+    except Exception:
+        return None
+
+def db_claim(conn, cache_key: str, fingerprint: str) -> Optional[Tuple[str, Optional[Dict[str, Any]]]]:
+    '''
+    Inserts an in-progress row for the key with a short lease, taking over a
+    row whose lease or TTL has expired. Returns None when this call owns the
+    key, otherwise the stored fingerprint and response (response is None while
+    another container is executing).
+    '''
+    cur = conn.cursor()
+    try:
+        cur.execute('''
+            DELETE FROM idempotency_keys
+            WHERE key IN (
+                SELECT key FROM idempotency_keys
+                WHERE expires_on_utc < NOW()
+                LIMIT 100
+            )
+        ''')
+        cur.execute('''
+            INSERT INTO idempotency_keys (key, fingerprint, expires_on_utc)
+            VALUES (%s, %s, NOW() + make_interval(secs => %s))
+            ON CONFLICT (key) DO UPDATE
+                SET fingerprint = EXCLUDED.fingerprint,
+                    status_code = NULL,
+                    response = NULL,
+                    created_on_utc = NOW(),
+                    expires_on_utc = EXCLUDED.expires_on_utc
+                WHERE idempotency_keys.expires_on_utc < NOW()
+            RETURNING key
+        ''', (cache_key, fingerprint, IDEMPOTENCY_LEASE_SECONDS))
+        if cur.fetchone():
+            return None
+        cur.execute('SELECT fingerprint, response FROM idempotency_keys WHERE key = %s', (cache_key,))
+        row = cur.fetchone()
+        if not row:
+            return None
+        return row[0], json.loads(row[1]) if row[1] else None
+    finally:
+        cur.close()
+
+def db_store(conn, cache_key: str, response: Dict[str, Any]) -> None:
+    '''
+    Saves the response and extends the row from the claim lease to the full TTL.
+    '''
+    cur = conn.cursor()
+    try:
+        cur.execute('''
+            UPDATE idempotency_keys
+            SET status_code = %s,
+                response = %s,
+                expires_on_utc = NOW() + make_interval(secs => %s)
+            WHERE key = %s
+        ''', (response['statusCode'], json.dumps(response), IDEMPOTENCY_TTL_SECONDS, cache_key))
+    finally:
+        cur.close()
+
+def db_release(conn, cache_key: str) -> None:
+    cur = conn.cursor()
+    try:
+        cur.execute('DELETE FROM idempotency_keys WHERE key = %s AND response IS NULL', (cache_key,))
+    finally:
+        cur.close()
+
+def db_claim_or_wait(conn, cache_key: str, fingerprint: str) -> Optional[Tuple[str, Optional[Dict[str, Any]]]]:
+    '''
+    Polls db_claim while another container is executing the same key. The
+    stored response stays None if it does not finish within IDEMPOTENCY_WAIT_SECONDS.
+    '''
+    deadline = time.monotonic() + IDEMPOTENCY_WAIT_SECONDS
+    while True:
+        claimed = db_claim(conn, cache_key, fingerprint)
+        if claimed is None or claimed[1] is not None or claimed[0] != fingerprint:
+            return claimed
+        if time.monotonic() >= deadline:
+            return claimed
+        time.sleep(0.2)
+
+def with_idempotency(
+    event: Dict[str, Any],
+    scope: str,
+    execute: Callable[[], Dict[str, Any]],
+    compact: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+    expand: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None
+) -> Dict[str, Any]:
+    '''
+    Runs execute() at most once per Idempotency-Key and replays its response.
+    compact, when given, shrinks the response before it is cached; expand
+    rebuilds the full response from the cached one on replay. If the
+    idempotency_keys table cannot be used, falls back to the in-memory cache.
+    A 5xx response releases the key so the client can retry; if execute()
+    raises, the claimed row stays locked until its lease expires.
+    '''
+    key = get_idempotency_key(event)
+    if not key:
+        return execute()
+
+    cache_key = f'{scope}:{key}'
+    fingerprint = request_fingerprint(event)
+
+    deadline = time.monotonic() + IDEMPOTENCY_WAIT_SECONDS
+    while True:
+        stored, in_flight = lookup_or_claim(cache_key)
+        if stored:
+            if stored[0] != fingerprint:
+                return error_response(422, 'Idempotency-Key reused with a different request')
+            return replay(expand(stored[1]) if expand else stored[1])
+        if not in_flight:
+            break
+        if not in_flight.wait(max(deadline - time.monotonic(), 0)):
+            return error_response(409, 'Request with this Idempotency-Key is still in progress')
+
+    conn = get_db_connection()
+    owned = False
+    try:
+        if conn:
+            try:
+                claimed = db_claim_or_wait(conn, cache_key, fingerprint)
+            except Exception:
+                conn.close()
+                conn = None
+        if conn:
+            if claimed is not None:
+                stored_fingerprint, stored_response = claimed
+                if stored_fingerprint != fingerprint:
+                    return error_response(422, 'Idempotency-Key reused with a different request')
+                if stored_response is None:
+                    return error_response(409, 'Request with this Idempotency-Key is still in progress')
+                remember(cache_key, fingerprint, stored_response)
+                return replay(expand(stored_response) if expand else stored_response)
+            owned = True
+
+        response = execute()
+
+        if response.get('statusCode', 500) < 500:
+            stored_response = compact(response) if compact else response
+            remember(cache_key, fingerprint, stored_response)
+            if owned:
+                try:
+                    db_store(conn, cache_key, stored_response)
+                except Exception:
+                    pass
+        elif owned:
+            try:
+                db_release(conn, cache_key)
+            except Exception:
+                pass
+        return response
+    finally:
+        release(cache_key)
+        if conn:
+            conn.close()
@@ -1,38 +1,65 @@
 import json
-import base64
-import uuid
 from typing import Dict, Any
 
 MOCK_IMAGES = {}
 
-def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+PREFLIGHT_RESPONSE = {
+    'statusCode': 200,
+    'headers': {
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Methods': 'POST, OPTIONS',
+        'Access-Control-Allow-Headers': 'Content-Type, Idempotency-Key',
+        'Access-Control-Max-Age': '86400'
+    },
+    'body': '',
+    'isBase64Encoded': False
+}
+
+METHOD_NOT_ALLOWED_RESPONSE = {
+    'statusCode': 405,
+    'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+    'body': json.dumps({'error': 'Method not allowed'}),
+    'isBase64Encoded': False
+}
+
+def image_data_url(image_data: str) -> str:
+    if image_data.startswith('data:'):
+        image_data = image_data.split(',')[1]
+    return f"data:image/jpeg;base64,{image_data}"
+
+def compact_upload_response(response: Dict[str, Any]) -> Dict[str, Any]:
     '''
-    Business: Upload product images and return URL
-    Args: event with POST method, base64 encoded image
-    Returns: Image URL
+    Keeps only the image id so the idempotency cache does not hold the whole
+    data: URL; restore_upload_response puts the URL back on replay.
+    '''
+    payload = json.loads(response['body'])
+    if 'url' not in payload:
+        return response
+    compacted = dict(response)
+    compacted['body'] = json.dumps({'id': payload['id']})
+    return compacted
+
+def restore_upload_response(event: Dict[str, Any], response: Dict[str, Any]) -> Dict[str, Any]:
+    '''
+    Rebuilds the URL from the request body; the idempotency fingerprint
+    guarantees a replayed request carries the same image.
     '''
+    payload = json.loads(response['body'])
+    if 'id' not in payload or 'url' in payload:
+        return response
+    body = json.loads(event.get('body') or '{}')
+    restored = dict(response)
+    restored['body'] = json.dumps({'url': image_data_url(body.get('image', '')), 'id': payload['id']})
+    return restored
+
+def handle_request(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     method: str = event.get('httpMethod', 'GET')
     
     if method == 'OPTIONS':
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'POST, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type',
-                'Access-Control-Max-Age': '86400'
-            },
-            'body': '',
-            'isBase64Encoded': False
-        }
+        return dict(PREFLIGHT_RESPONSE)
     
     if method != 'POST':
-        return {
-            'statusCode': 405,
-            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({'error': 'Method not allowed'}),
-            'isBase64Encoded': False
-        }
+        return dict(METHOD_NOT_ALLOWED_RESPONSE)
     
     try:
         body = json.loads(event.get('body', '{}'))
@@ -47,6 +74,8 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 'isBase64Encoded': False
             }
         
+        import uuid
+        
         image_id = str(uuid.uuid4())
         
         if image_data.startswith('data:'):
@@ -57,7 +86,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'filename': filename
         }
         
-        image_url = f"data:image/jpeg;base64,{image_data}"
+        image_url = image_data_url(image_data)
         
         return {
             'statusCode': 200,
@@ -76,3 +105,24 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'body': json.dumps({'error': str(e)}),
             'isBase64Encoded': False
         }
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    '''
+    Business: Upload product images and return URL
+    Args: event with POST method, base64 encoded image
+    Returns: Image URL
+    '''
+    method: str = event.get('httpMethod', 'GET')
+    
+    if method == 'POST':
+        from idempotency import with_idempotency
+        
+        return with_idempotency(
+            event,
+            'upload-image',
+            lambda: handle_request(event, context),
+            compact=compact_upload_response,
+            expand=lambda response: restore_upload_response(event, response)
+        )
+    
+    return handle_request(event, context)
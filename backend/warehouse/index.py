@@ -5,170 +5,596 @@ Args: event - dict с httpMethod, queryStringParameters
 Returns: HTTP response с данными продуктов, заказов и статистики
 '''
 
+import io
 import json
+import math
 import os
-from typing import Dict, Any
+import time
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple, TypeVar
+from datetime import date, datetime
 from decimal import Decimal
-import psycopg2
-from psycopg2.extras import RealDictCursor
+
+EXPORT_BATCH_SIZE = 5000
+EXPORT_PAGE_SIZE = 20000
+
+EXPORT_QUERIES = {
+    'products': ('p.id', '''
+        SELECT 
+            p.id,
+            p.sku,
+            p.name,
+            c.name as category,
+            m.name as manufacturer,
+            p.price,
+            p.min_stock_level,
+            p.created_on_utc,
+            p.updated_on_utc
+        FROM products p
+        LEFT JOIN categories c ON p.category_id = c.id
+        LEFT JOIN manufacturers m ON p.manufacturer_id = m.id
+        WHERE {after_filter}
+        ORDER BY p.id
+        LIMIT %s
+    '''),
+    'orders': ('o.id', '''
+        SELECT 
+            o.id,
+            o.order_number,
+            c.name as customer,
+            o.order_type,
+            o.status,
+            o.total_amount,
+            o.order_date,
+            o.created_on_utc,
+            o.updated_on_utc
+        FROM orders o
+        LEFT JOIN customers c ON o.customer_id = c.id
+        WHERE {after_filter}
+        ORDER BY o.id
+        LIMIT %s
+    '''),
+    'stock': ('pl.id', '''
+        SELECT 
+            pl.id,
+            pl.product_id,
+            p.name as product_name,
+            pl.location_id,
+            l.name as location_name,
+            pl.quantity,
+            pl.updated_on_utc
+        FROM product_locations pl
+        JOIN products p ON pl.product_id = p.id
+        JOIN locations l ON pl.location_id = l.id
+        WHERE {after_filter}
+        ORDER BY pl.id
+        LIMIT %s
+    ''')
+}
+
+EXPORT_CURSOR_TYPES = {
+    'products': str,
+    'orders': str,
+    'stock': int
+}
+
+EXPORT_CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8'
+}
+
+PREFLIGHT_RESPONSE = {
+    'statusCode': 200,
+    'headers': {
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+        'Access-Control-Allow-Headers': 'Content-Type',
+        'Access-Control-Max-Age': '86400'
+    },
+    'body': '',
+    'isBase64Encoded': False
+}
+
+METHOD_NOT_ALLOWED_RESPONSE = {
+    'statusCode': 405,
+    'headers': {'Access-Control-Allow-Origin': '*'},
+    'body': json.dumps({'error': 'Method not allowed'}),
+    'isBase64Encoded': False
+}
+
+SYNC_TOKEN_QUERY = '''
+    SELECT LEAST(
+        clock_timestamp(),
+        (
+            SELECT MIN(xact_start)
+            FROM pg_stat_activity
+            WHERE datname = current_database()
+                AND backend_type = 'client backend'
+                AND xact_start IS NOT NULL
+                AND pid <> pg_backend_pid()
+        )
+    )::timestamp as sync_token
+'''
+
+READ_ONLY_ACTIONS = {'dashboard', 'products', 'orders', 'lowStock', 'export'}
+REPLICA_CONNECT_TIMEOUT = 2
+REPLICA_BACKOFF_SECONDS = 5
+REPLICA_MAX_BACKOFF_SECONDS = 300
+
+replica_health: Dict[str, Dict[str, float]] = {}
+replica_cursor = 0
+
+T = TypeVar('T')
 
 class DecimalEncoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, Decimal):
             return float(obj)
+        if isinstance(obj, (datetime, date)):
+            return obj.isoformat()
         return super(DecimalEncoder, self).default(obj)
 
+def get_replica_dsns() -> List[str]:
+    raw = os.environ.get('DATABASE_READ_URL', '')
+    return [dsn.strip() for dsn in raw.split(',') if dsn.strip()]
+
+def mark_replica_failed(dsn: str) -> None:
+    state = replica_health.setdefault(dsn, {'failures': 0, 'ejected_until': 0})
+    state['failures'] += 1
+    backoff = REPLICA_BACKOFF_SECONDS * 2 ** (state['failures'] - 1)
+    state['ejected_until'] = time.monotonic() + min(backoff, REPLICA_MAX_BACKOFF_SECONDS)
+
+def connect_replica() -> Tuple[Optional[str], Any]:
+    '''
+    Round-robins over DATABASE_READ_URL replicas, skipping ejected ones. Each
+    failure doubles the ejection window; a successful connect resets it.
+    Returns (dsn, connection), or (None, None) when no replica is usable.
+    '''
+    import psycopg2
+    from psycopg2.extras import RealDictCursor
+    global replica_cursor
+    
+    dsns = get_replica_dsns()
+    now = time.monotonic()
+    for offset in range(len(dsns)):
+        dsn = dsns[(replica_cursor + offset) % len(dsns)]
+        if replica_health.get(dsn, {}).get('ejected_until', 0) > now:
+            continue
+        try:
+            conn = psycopg2.connect(dsn, cursor_factory=RealDictCursor, connect_timeout=REPLICA_CONNECT_TIMEOUT)
+        except psycopg2.OperationalError:
+            mark_replica_failed(dsn)
+            continue
+        conn.set_session(readonly=True)
+        replica_health.pop(dsn, None)
+        replica_cursor = (replica_cursor + offset + 1) % len(dsns)
+        return dsn, conn
+    return None, None
+
 def get_db_connection():
+    import psycopg2
+    from psycopg2.extras import RealDictCursor
+    
     dsn = os.environ.get('DATABASE_URL')
     return psycopg2.connect(dsn, cursor_factory=RealDictCursor)
 
-def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
-    method: str = event.get('httpMethod', 'GET')
+def run_with_failover(read_only: bool, work: Callable[[Any], T]) -> T:
+    '''
+    Runs work(conn) on a replica when read_only, otherwise on the primary. If
+    a replica query fails with an operational or internal error (dropped
+    connection, recovery conflict, timeout) the replica is ejected and the
+    work runs again on the next replica, then on the primary.
+    '''
+    import psycopg2
     
-    if method == 'OPTIONS':
+    while read_only:
+        dsn, conn = connect_replica()
+        if conn is None:
+            break
+        try:
+            return work(conn)
+        except (psycopg2.OperationalError, psycopg2.InternalError, psycopg2.InterfaceError):
+            mark_replica_failed(dsn)
+        finally:
+            conn.close()
+    
+    conn = get_db_connection()
+    try:
+        return work(conn)
+    finally:
+        conn.close()
+
+def use_read_replica(method: str, action: str, params: Dict[str, Any]) -> bool:
+    '''
+    GET requests for read-only actions go to replicas unless the caller asks to
+    read its own writes with consistency=primary. Change-feed requests (since=)
+    stay on the primary: a replica cannot see the primary's open transactions,
+    so it cannot issue a safe sync token.
+    '''
+    return (
+        method == 'GET'
+        and action in READ_ONLY_ACTIONS
+        and params.get('consistency') != 'primary'
+        and not params.get('since')
+    )
+
+def fetch_sync_token(cur) -> Optional[datetime]:
+    '''
+    Change-feed token: the current time, held back to the start of the oldest
+    transaction still open in this database. Rows written by that transaction
+    get updated_on_utc >= its start, so they still show up after the token once
+    it commits. Replica sessions return None since they cannot see the primary.
+    '''
+    if cur.connection.readonly:
+        return None
+    cur.execute(SYNC_TOKEN_QUERY)
+    return cur.fetchone()['sync_token']
+
+def parse_low_stock_params(params: Dict[str, Any]) -> Tuple[Optional[int], int, int]:
+    '''
+    With locationId, low stock and reorder quantities are computed from that
+    location's quantity against the product's min_stock_level; without it, from
+    the product's total across locations.
+    '''
+    location_id = params.get('locationId')
+    days = int(params.get('days', 30))
+    cover_days = int(params.get('coverDays', 14))
+    if days < 1 or cover_days < 0:
+        raise ValueError('days must be >= 1 and coverDays >= 0')
+    return (int(location_id) if location_id else None), days, cover_days
+
+def error_response(status_code: int, message: str) -> Dict[str, Any]:
+    return {
+        'statusCode': status_code,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*'
+        },
+        'body': json.dumps({'error': message}, ensure_ascii=False),
+        'isBase64Encoded': False
+    }
+
+def iter_export_chunks(conn, entity: str, fmt: str, after: Optional[Any], state: Dict[str, Any]) -> Iterator[str]:
+    '''
+    Reads one export page (EXPORT_PAGE_SIZE rows after the `after` key) through
+    a named (server-side) cursor in EXPORT_BATCH_SIZE batches and yields one
+    CSV/NDJSON text chunk per batch. The last key and row count are left in
+    `state` for the next page's cursor.
+    '''
+    import csv
+    from psycopg2.extras import RealDictCursor
+    
+    key_column, query = EXPORT_QUERIES[entity]
+    cur = conn.cursor(name=f'export_{entity}', cursor_factory=RealDictCursor)
+    cur.itersize = EXPORT_BATCH_SIZE
+    try:
+        if after is None:
+            cur.execute(query.format(after_filter='TRUE'), (EXPORT_PAGE_SIZE,))
+        else:
+            cur.execute(query.format(after_filter=f'{key_column} > %s'), (after, EXPORT_PAGE_SIZE))
+        header_written = after is not None
+        while True:
+            rows = cur.fetchmany(EXPORT_BATCH_SIZE)
+            buf = io.StringIO()
+            if fmt == 'csv':
+                writer = csv.writer(buf)
+                if not header_written:
+                    writer.writerow([col[0] for col in cur.description])
+                    header_written = True
+                for row in rows:
+                    writer.writerow([
+                        v.isoformat() if isinstance(v, (datetime, date)) else v
+                        for v in row.values()
+                    ])
+            else:
+                for row in rows:
+                    buf.write(json.dumps(row, ensure_ascii=False, cls=DecimalEncoder))
+                    buf.write('\n')
+            if rows:
+                state['rows'] += len(rows)
+                state['last_key'] = rows[-1]['id']
+            if buf.tell():
+                yield buf.getvalue()
+            if len(rows) < EXPORT_BATCH_SIZE:
+                break
+    finally:
+        cur.close()
+
+def export_response(params: Dict[str, Any], read_only: bool) -> Dict[str, Any]:
+    '''
+    Keyset-paginated export: each call returns at most EXPORT_PAGE_SIZE rows,
+    so memory and response size stay bounded regardless of table size. When
+    more rows remain, the X-Export-Cursor header carries the last exported key
+    to pass back as `cursor=`. Gzipped pages are independent gzip members and
+    may be concatenated into one valid .gz file.
+    '''
+    entity = params.get('entity', 'products')
+    fmt = params.get('format', 'csv')
+    compress = params.get('gzip', '1') not in ('0', 'false')
+    after = params.get('cursor') or None
+    
+    if entity not in EXPORT_QUERIES or fmt not in EXPORT_CONTENT_TYPES:
+        return error_response(400, 'Unknown export entity or format')
+    
+    if after is not None:
+        try:
+            after = EXPORT_CURSOR_TYPES[entity](after)
+        except ValueError:
+            return error_response(400, 'Invalid export cursor')
+    
+    def write_page(conn) -> Tuple[bytes, Dict[str, Any]]:
+        import gzip
+        
+        out = io.BytesIO()
+        sink = gzip.GzipFile(fileobj=out, mode='wb', compresslevel=6) if compress else out
+        state = {'rows': 0, 'last_key': None}
+        for chunk in iter_export_chunks(conn, entity, fmt, after, state):
+            sink.write(chunk.encode('utf-8'))
+        if compress:
+            sink.close()
+        conn.rollback()
+        return out.getvalue(), state
+    
+    try:
+        data, state = run_with_failover(read_only, write_page)
+    except Exception as e:
+        return error_response(500, str(e))
+    
+    headers = {
+        'Content-Type': 'application/gzip' if compress else EXPORT_CONTENT_TYPES[fmt],
+        'Content-Disposition': f'attachment; filename="{entity}.{fmt}{".gz" if compress else ""}"',
+        'X-Export-Rows': str(state['rows']),
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Expose-Headers': 'X-Export-Cursor, X-Export-Rows'
+    }
+    if state['rows'] == EXPORT_PAGE_SIZE:
+        headers['X-Export-Cursor'] = str(state['last_key'])
+    
+    if compress:
+        import base64
+        
         return {
             'statusCode': 200,
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type',
-                'Access-Control-Max-Age': '86400'
-            },
-            'body': '',
-            'isBase64Encoded': False
+            'headers': headers,
+            'body': base64.b64encode(data).decode('ascii'),
+            'isBase64Encoded': True
         }
     
-    if method == 'GET':
-        params = event.get('queryStringParameters') or {}
-        action = params.get('action', 'dashboard')
-        
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        try:
-            if action == 'dashboard':
-                cur.execute('''
-                    SELECT 
-                        (SELECT COUNT(*) FROM products) as total_products,
-                        (SELECT COUNT(*) FROM orders WHERE status != 'completed') as active_orders,
-                        (SELECT COUNT(*) FROM outlets WHERE is_active = true) as active_outlets,
-                        (SELECT COUNT(*) FROM write_offs WHERE created_on_utc >= NOW() - INTERVAL '7 days') as recent_write_offs
-                ''')
-                stats = cur.fetchone()
-                
-                cur.execute('''
-                    SELECT 
-                        TO_CHAR(order_date, 'Mon') as month,
-                        SUM(total_amount) as sales,
-                        COUNT(*) as orders
-                    FROM orders
-                    WHERE order_date >= NOW() - INTERVAL '6 months'
-                    GROUP BY DATE_TRUNC('month', order_date), TO_CHAR(order_date, 'Mon')
-                    ORDER BY DATE_TRUNC('month', order_date)
-                ''')
-                sales_data = cur.fetchall()
-                
-                cur.execute('''
-                    SELECT 
-                        c.name,
-                        COUNT(p.id) as value
-                    FROM categories c
-                    LEFT JOIN products p ON c.id = p.category_id
-                    GROUP BY c.name
-                    ORDER BY value DESC
-                ''')
-                category_data = cur.fetchall()
-                
-                result = {
-                    'stats': dict(stats),
-                    'salesData': [dict(row) for row in sales_data],
-                    'categoryData': [dict(row) for row in category_data]
-                }
-                
-            elif action == 'products':
-                search = params.get('search', '')
-                query = '''
-                    SELECT 
-                        p.id,
-                        p.name,
-                        c.name as category,
-                        COALESCE(SUM(pl.quantity), 0) as stock,
-                        p.price,
-                        CASE 
-                            WHEN COALESCE(SUM(pl.quantity), 0) = 0 THEN 'Нет'
-                            WHEN COALESCE(SUM(pl.quantity), 0) <= p.min_stock_level THEN 'Мало'
-                            ELSE 'В наличии'
-                        END as status
-                    FROM products p
-                    LEFT JOIN categories c ON p.category_id = c.id
-                    LEFT JOIN product_locations pl ON p.id = pl.product_id
-                    WHERE p.name ILIKE %s
-                    GROUP BY p.id, p.name, c.name, p.price, p.min_stock_level
-                    ORDER BY p.name
-                '''
-                cur.execute(query, (f'%{search}%',))
-                products = cur.fetchall()
-                result = {'products': [dict(row) for row in products]}
-                
-            elif action == 'orders':
-                cur.execute('''
-                    SELECT 
-                        o.id,
-                        o.order_number as id_display,
-                        COALESCE(c.name, 'Склад') as outlet,
-                        o.order_type as type,
-                        COUNT(oi.id) as items,
-                        TO_CHAR(o.order_date, 'DD.MM.YYYY') as date,
-                        CASE 
-                            WHEN o.status = 'completed' THEN 'Выполнен'
-                            WHEN o.status = 'processing' THEN 'В обработке'
-                            ELSE 'Ожидает'
-                        END as status
-                    FROM orders o
-                    LEFT JOIN customers c ON o.customer_id = c.id
-                    LEFT JOIN order_items oi ON o.id = oi.order_id
-                    GROUP BY o.id, o.order_number, c.name, o.order_type, o.order_date, o.status
-                    ORDER BY o.order_date DESC
-                    LIMIT 10
-                ''')
-                orders = cur.fetchall()
-                result = {'orders': [dict(row) for row in orders]}
+    return {
+        'statusCode': 200,
+        'headers': headers,
+        'body': data.decode('utf-8'),
+        'isBase64Encoded': False
+    }
+
+def query_action(conn, action: str, params: Dict[str, Any], low_stock_args: Optional[Tuple[Optional[int], int, int]]) -> Dict[str, Any]:
+    cur = conn.cursor()
+    try:
+        if action == 'dashboard':
+            cur.execute('''
+                SELECT 
+                    (SELECT COUNT(*) FROM products) as total_products,
+                    (SELECT COUNT(*) FROM orders WHERE status != 'completed') as active_orders,
+                    (SELECT COUNT(*) FROM outlets WHERE is_active = true) as active_outlets,
+                    (SELECT COUNT(*) FROM write_offs WHERE created_on_utc >= NOW() - INTERVAL '7 days') as recent_write_offs
+            ''')
+            stats = cur.fetchone()
             
-            else:
-                result = {'error': 'Unknown action'}
+            cur.execute('''
+                SELECT 
+                    TO_CHAR(order_date, 'Mon') as month,
+                    SUM(total_amount) as sales,
+                    COUNT(*) as orders
+                FROM orders
+                WHERE order_date >= NOW() - INTERVAL '6 months'
+                GROUP BY DATE_TRUNC('month', order_date), TO_CHAR(order_date, 'Mon')
+                ORDER BY DATE_TRUNC('month', order_date)
+            ''')
+            sales_data = cur.fetchall()
             
-            cur.close()
-            conn.close()
+            cur.execute('''
+                SELECT 
+                    c.name,
+                    COUNT(p.id) as value
+                FROM categories c
+                LEFT JOIN products p ON c.id = p.category_id
+                GROUP BY c.name
+                ORDER BY value DESC
+            ''')
+            category_data = cur.fetchall()
             
-            return {
-                'statusCode': 200,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps(result, ensure_ascii=False, cls=DecimalEncoder),
-                'isBase64Encoded': False
+            result = {
+                'stats': dict(stats),
+                'salesData': [dict(row) for row in sales_data],
+                'categoryData': [dict(row) for row in category_data]
             }
             
-        except Exception as e:
-            if cur:
-                cur.close()
-            if conn:
-                conn.close()
+        elif action == 'products':
+            search = params.get('search', '')
+            since = params.get('since')
+            
+            sync_token = fetch_sync_token(cur)
+            
+            query = '''
+                SELECT 
+                    p.id,
+                    p.name,
+                    c.name as category,
+                    COALESCE(ps.total_quantity, 0) as stock,
+                    p.price,
+                    CASE 
+                        WHEN COALESCE(ps.total_quantity, 0) = 0 THEN 'Нет'
+                        WHEN ps.is_low THEN 'Мало'
+                        ELSE 'В наличии'
+                    END as status,
+                    p.is_archive,
+                    p.updated_on_utc as modified_on_utc
+                FROM products p
+                LEFT JOIN categories c ON p.category_id = c.id
+                LEFT JOIN product_stock ps ON p.id = ps.product_id
+                WHERE p.name ILIKE %s AND {feed_filter}
+                ORDER BY p.name
+            '''
+            if since:
+                cur.execute(query.format(feed_filter='p.updated_on_utc > %s'), (f'%{search}%', since))
+            else:
+                cur.execute(query.format(feed_filter='NOT p.is_archive'), (f'%{search}%',))
+            products = cur.fetchall()
+            result = {'products': [dict(row) for row in products if not row['is_archive']]}
+            if sync_token:
+                result['syncToken'] = sync_token
+            if since:
+                result['deleted'] = [
+                    {'id': row['id'], 'modified_on_utc': row['modified_on_utc']}
+                    for row in products if row['is_archive']
+                ]
+            
+        elif action == 'lowStock':
+            location_id, days, cover_days = low_stock_args
+            
+            # Sales velocity is catalogue-wide: order_products carry no location.
+            query = '''
+                SELECT 
+                    p.id,
+                    p.name,
+                    c.name as category,
+                    {stock} as stock,
+                    p.min_stock_level,
+                    COALESCE(v.sold, 0) as sold
+                FROM {source}
+                LEFT JOIN categories c ON p.category_id = c.id
+                LEFT JOIN LATERAL (
+                    SELECT SUM(op.quantity) as sold
+                    FROM order_products op
+                    JOIN orders o ON o.id = op.order_id
+                    WHERE op.product_id = p.id
+                        AND op.created_on_utc >= NOW() - make_interval(days => %s)
+                        AND LOWER(o.status) <> 'cancelled'
+                ) v ON true
+                WHERE {low_filter} AND NOT p.is_archive
+                ORDER BY {stock} - p.min_stock_level, p.name
+            '''
+            if location_id is None:
+                cur.execute(query.format(
+                    stock='ps.total_quantity',
+                    source='product_stock ps JOIN products p ON p.id = ps.product_id',
+                    low_filter='ps.is_low'
+                ), (days,))
+            else:
+                cur.execute(query.format(
+                    stock='pl.quantity',
+                    source='product_locations pl JOIN products p ON p.id = pl.product_id',
+                    low_filter='pl.location_id = %s AND pl.quantity <= p.min_stock_level'
+                ), (days, location_id))
+            rows = cur.fetchall()
+            
+            low_stock = []
+            for row in rows:
+                daily_velocity = row['sold'] / days
+                reorder = math.ceil(daily_velocity * cover_days + row['min_stock_level'] - row['stock'])
+                item = dict(row)
+                item['daily_velocity'] = round(daily_velocity, 3)
+                item['reorder_quantity'] = max(reorder, 0)
+                low_stock.append(item)
             
-            return {
-                'statusCode': 500,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({'error': str(e)}, ensure_ascii=False),
-                'isBase64Encoded': False
+            result = {
+                'lowStock': low_stock,
+                'locationId': location_id,
+                'days': days,
+                'coverDays': cover_days
             }
+            
+        elif action == 'orders':
+            since = params.get('since')
+            sync_token = fetch_sync_token(cur)
+            
+            # Lines are counted per returned order, so the latest-orders page
+            # reads idx_orders_date up to the LIMIT instead of grouping all orders.
+            query = '''
+                SELECT 
+                    o.id,
+                    o.order_number as id_display,
+                    COALESCE(c.name, 'Склад') as outlet,
+                    o.order_type as type,
+                    op.items,
+                    TO_CHAR(o.order_date, 'DD.MM.YYYY') as date,
+                    CASE 
+                        WHEN o.status = 'completed' THEN 'Выполнен'
+                        WHEN o.status = 'processing' THEN 'В обработке'
+                        ELSE 'Ожидает'
+                    END as status,
+                    o.updated_on_utc as modified_on_utc
+                FROM orders o
+                LEFT JOIN customers c ON o.customer_id = c.id
+                CROSS JOIN LATERAL (
+                    SELECT COUNT(*) as items
+                    FROM order_products
+                    WHERE order_id = o.id
+                ) op
+                WHERE {feed_filter}
+                ORDER BY o.order_date DESC
+                {limit}
+            '''
+            if since:
+                cur.execute(query.format(feed_filter='o.updated_on_utc > %s', limit=''), (since,))
+            else:
+                cur.execute(query.format(feed_filter='TRUE', limit='LIMIT 10'))
+            orders = cur.fetchall()
+            result = {'orders': [dict(row) for row in orders]}
+            if sync_token:
+                result['syncToken'] = sync_token
+        
+        else:
+            result = {'error': 'Unknown action'}
+        
+        return result
+    finally:
+        cur.close()
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    method: str = event.get('httpMethod', 'GET')
     
-    return {
-        'statusCode': 405,
-        'headers': {'Access-Control-Allow-Origin': '*'},
-        'body': json.dumps({'error': 'Method not allowed'}),
-        'isBase64Encoded': False
-    }
\ No newline at end of file
+    if method == 'OPTIONS':
+        return dict(PREFLIGHT_RESPONSE)
+    
+    if method == 'GET':
+        params = event.get('queryStringParameters') or {}
+        action = params.get('action', 'dashboard')
+        
+        since = params.get('since')
+        if since:
+            try:
+                datetime.fromisoformat(since)
+            except ValueError:
+                return error_response(400, 'Invalid since token')
+        
+        low_stock_args = None
+        if action == 'lowStock':
+            try:
+                low_stock_args = parse_low_stock_params(params)
+            except ValueError:
+                return error_response(400, 'locationId, days and coverDays must be integers (days >= 1, coverDays >= 0)')
+        
+        read_only = use_read_replica(method, action, params)
+        
+        if action == 'export':
+            return export_response(params, read_only)
+        
+        try:
+            result = run_with_failover(
+                read_only,
+                lambda conn: query_action(conn, action, params, low_stock_args)
+            )
+        except Exception as e:
+            return error_response(500, str(e))
+        
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps(result, ensure_ascii=False, cls=DecimalEncoder),
+            'isBase64Encoded': False
+        }
+    
+    return dict(METHOD_NOT_ALLOWED_RESPONSE)
\ No newline at end of file
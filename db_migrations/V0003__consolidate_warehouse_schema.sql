@@ -0,0 +1,53 @@
+ALTER TABLE products ADD COLUMN IF NOT EXISTS image_url TEXT;
+ALTER TABLE products ADD COLUMN IF NOT EXISTS currency_code VARCHAR(3) NOT NULL DEFAULT 'RUB';
+ALTER TABLE products ADD COLUMN IF NOT EXISTS is_archive BOOLEAN NOT NULL DEFAULT FALSE;
+
+ALTER TABLE orders ADD COLUMN IF NOT EXISTS username VARCHAR(255);
+ALTER TABLE orders ADD COLUMN IF NOT EXISTS payment_type VARCHAR(50) NOT NULL DEFAULT 'Card';
+ALTER TABLE orders ADD COLUMN IF NOT EXISTS comment TEXT;
+ALTER TABLE orders ADD COLUMN IF NOT EXISTS loyalty_card_number VARCHAR(100);
+ALTER TABLE orders ADD COLUMN IF NOT EXISTS completed_on_utc TIMESTAMP;
+
+ALTER TABLE product_barcodes ALTER COLUMN product_id TYPE VARCHAR(50) USING product_id::VARCHAR;
+DELETE FROM product_barcodes WHERE product_id IS NULL OR product_id NOT IN (SELECT id FROM products);
+ALTER TABLE product_barcodes ALTER COLUMN product_id SET NOT NULL;
+ALTER TABLE product_barcodes RENAME COLUMN created_at TO created_on_utc;
+ALTER TABLE product_barcodes ALTER COLUMN created_on_utc SET NOT NULL;
+ALTER TABLE product_barcodes
+    ADD CONSTRAINT fk_product_barcodes_product FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE;
+
+ALTER TABLE order_products ALTER COLUMN order_id TYPE VARCHAR(50) USING order_id::VARCHAR;
+ALTER TABLE order_products ALTER COLUMN product_id TYPE VARCHAR(50) USING product_id::VARCHAR;
+DELETE FROM order_products WHERE order_id IS NULL OR order_id NOT IN (SELECT id FROM orders);
+UPDATE order_products SET product_id = NULL WHERE product_id NOT IN (SELECT id FROM products);
+ALTER TABLE order_products ALTER COLUMN order_id SET NOT NULL;
+ALTER TABLE order_products ALTER COLUMN unit_price TYPE DECIMAL(18,2);
+ALTER TABLE order_products ALTER COLUMN purchase_price TYPE DECIMAL(18,2);
+ALTER TABLE order_products ALTER COLUMN total_price TYPE DECIMAL(18,2);
+ALTER TABLE order_products ALTER COLUMN profit TYPE DECIMAL(18,2);
+ALTER TABLE order_products ALTER COLUMN purchase_price DROP NOT NULL;
+ALTER TABLE order_products ALTER COLUMN profit DROP NOT NULL;
+ALTER TABLE order_products RENAME COLUMN created_at TO created_on_utc;
+ALTER TABLE order_products ALTER COLUMN created_on_utc SET NOT NULL;
+ALTER TABLE order_products
+    ADD CONSTRAINT fk_order_products_order FOREIGN KEY (order_id) REFERENCES orders(id) ON DELETE CASCADE;
+ALTER TABLE order_products
+    ADD CONSTRAINT fk_order_products_product FOREIGN KEY (product_id) REFERENCES products(id);
+
+-- order_items is superseded by order_products; purchase price was never recorded
+-- there, so migrated rows keep purchase_price and profit unknown (NULL).
+INSERT INTO order_products (order_id, product_id, product_name, quantity, unit_price, purchase_price, total_price, profit, created_on_utc)
+SELECT oi.order_id, oi.product_id, p.name, oi.quantity, oi.unit_price, NULL, oi.total_price, NULL, oi.created_on_utc
+FROM order_items oi
+JOIN products p ON p.id = oi.product_id;
+
+DROP TABLE order_items;
+
+CREATE INDEX IF NOT EXISTS idx_product_barcodes_product ON product_barcodes(product_id);
+CREATE INDEX IF NOT EXISTS idx_product_barcodes_barcode ON product_barcodes(barcode);
+CREATE INDEX IF NOT EXISTS idx_order_products_order ON order_products(order_id);
+CREATE INDEX IF NOT EXISTS idx_order_products_product_created ON order_products(product_id, created_on_utc);
+
+-- (product_id, location_id) lookups use the UNIQUE constraint index from V0001,
+-- which also serves product_id-only scans.
+DROP INDEX IF EXISTS idx_product_locations_product;
@@ -0,0 +1,55 @@
+CREATE INDEX IF NOT EXISTS idx_products_updated ON products(updated_on_utc);
+CREATE INDEX IF NOT EXISTS idx_orders_updated ON orders(updated_on_utc);
+
+-- clock_timestamp() rather than NOW(): the change feed holds its token back to the
+-- oldest open transaction's start, so rows must be stamped no earlier than that.
+CREATE OR REPLACE FUNCTION touch_updated_on_utc() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_on_utc = clock_timestamp();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_products_touch_updated
+    BEFORE INSERT OR UPDATE ON products
+    FOR EACH ROW EXECUTE FUNCTION touch_updated_on_utc();
+
+CREATE TRIGGER trg_orders_touch_updated
+    BEFORE INSERT OR UPDATE ON orders
+    FOR EACH ROW EXECUTE FUNCTION touch_updated_on_utc();
+
+-- Stock movements change a product's feed representation, so they bump the product too.
+CREATE OR REPLACE FUNCTION touch_product_on_stock_change() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        UPDATE products SET updated_on_utc = clock_timestamp() WHERE id = OLD.product_id;
+        RETURN OLD;
+    END IF;
+    UPDATE products SET updated_on_utc = clock_timestamp() WHERE id = NEW.product_id;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_product_locations_touch_product
+    AFTER INSERT OR UPDATE OR DELETE ON product_locations
+    FOR EACH ROW EXECUTE FUNCTION touch_product_on_stock_change();
+
+-- The orders feed reports the line count, so line changes bump the parent order.
+CREATE OR REPLACE FUNCTION touch_order_on_line_change() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE orders SET updated_on_utc = clock_timestamp() WHERE id = OLD.order_id;
+    END IF;
+    IF TG_OP = 'DELETE' THEN
+        RETURN OLD;
+    END IF;
+    IF TG_OP = 'INSERT' OR NEW.order_id IS DISTINCT FROM OLD.order_id THEN
+        UPDATE orders SET updated_on_utc = clock_timestamp() WHERE id = NEW.order_id;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_order_products_touch_order
+    AFTER INSERT OR UPDATE OR DELETE ON order_products
+    FOR EACH ROW EXECUTE FUNCTION touch_order_on_line_change();
@@ -0,0 +1,73 @@
+CREATE TABLE IF NOT EXISTS product_stock (
+    product_id VARCHAR(50) PRIMARY KEY REFERENCES products(id) ON DELETE CASCADE,
+    total_quantity INTEGER NOT NULL DEFAULT 0,
+    min_stock_level INTEGER NOT NULL,
+    is_low BOOLEAN NOT NULL,
+    updated_on_utc TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_product_stock_low ON product_stock(product_id) WHERE is_low;
+
+INSERT INTO product_stock (product_id, total_quantity, min_stock_level, is_low)
+SELECT 
+    p.id,
+    COALESCE(SUM(pl.quantity), 0),
+    p.min_stock_level,
+    COALESCE(SUM(pl.quantity), 0) <= p.min_stock_level
+FROM products p
+LEFT JOIN product_locations pl ON pl.product_id = p.id
+GROUP BY p.id, p.min_stock_level
+ON CONFLICT (product_id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION apply_stock_delta(p_product_id VARCHAR, p_delta INTEGER) RETURNS VOID AS $$
+BEGIN
+    UPDATE product_stock
+    SET total_quantity = total_quantity + p_delta,
+        is_low = total_quantity + p_delta <= min_stock_level,
+        updated_on_utc = NOW()
+    WHERE product_id = p_product_id;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION product_stock_on_location_change() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.product_id = NEW.product_id THEN
+        IF NEW.quantity <> OLD.quantity THEN
+            PERFORM apply_stock_delta(NEW.product_id, NEW.quantity - OLD.quantity);
+        END IF;
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM apply_stock_delta(OLD.product_id, -OLD.quantity);
+    END IF;
+    IF TG_OP IN ('UPDATE', 'INSERT') THEN
+        PERFORM apply_stock_delta(NEW.product_id, NEW.quantity);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_product_locations_stock
+    AFTER INSERT OR UPDATE OR DELETE ON product_locations
+    FOR EACH ROW EXECUTE FUNCTION product_stock_on_location_change();
+
+CREATE OR REPLACE FUNCTION product_stock_on_product_change() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO product_stock (product_id, total_quantity, min_stock_level, is_low)
+        VALUES (NEW.id, 0, NEW.min_stock_level, 0 <= NEW.min_stock_level)
+        ON CONFLICT (product_id) DO NOTHING;
+    ELSIF NEW.min_stock_level <> OLD.min_stock_level THEN
+        UPDATE product_stock
+        SET min_stock_level = NEW.min_stock_level,
+            is_low = total_quantity <= NEW.min_stock_level,
+            updated_on_utc = NOW()
+        WHERE product_id = NEW.id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_products_stock
+    AFTER INSERT OR UPDATE OF min_stock_level ON products
+    FOR EACH ROW EXECUTE FUNCTION product_stock_on_product_change();
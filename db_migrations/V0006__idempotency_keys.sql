@@ -0,0 +1,10 @@
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key VARCHAR(300) PRIMARY KEY,
+    fingerprint VARCHAR(64) NOT NULL,
+    status_code INTEGER,
+    response TEXT,
+    created_on_utc TIMESTAMP NOT NULL DEFAULT NOW(),
+    expires_on_utc TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expires ON idempotency_keys(expires_on_utc);
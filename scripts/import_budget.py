@@ -0,0 +1,114 @@
+'''
+Import budget for the backend functions.
+
+Every backend/<function> is a separate serverless entry point, so its import
+cost is paid on each cold start. For each function this imports `index` in a
+fresh interpreter from the function directory and checks two things that do
+not depend on host speed: the number of modules `import index` pulls in
+stays within the function's budget, and an OPTIONS preflight leaves the
+deferred heavy modules unloaded. The cumulative import time from
+`python -X importtime` (best of RUNS) is printed for reference only; it
+mostly reflects the standard library and the machine, so it is not checked.
+
+Usage: python scripts/import_budget.py
+Exits non-zero when any function is over budget.
+'''
+
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.join(ROOT, 'backend')
+RUNS = 5
+
+# Modules newly loaded by `import index`, with headroom for interpreter
+# differences; an eager psycopg2 import alone adds about 18.
+IMPORT_BUDGETS_MODULES = {
+    'auth': 38,
+    'orders': 42,
+    'products': 42,
+    'upload-image': 38,
+    'warehouse': 45
+}
+
+DEFERRED_MODULES = {
+    'auth': ['jwt'],
+    'orders': ['idempotency', 'hashlib', 'threading', 'psycopg2'],
+    'products': ['idempotency', 'hashlib', 'threading', 'psycopg2'],
+    'upload-image': ['idempotency', 'hashlib', 'threading', 'psycopg2', 'uuid'],
+    'warehouse': ['psycopg2', 'gzip', 'csv', 'base64']
+}
+
+PROBE = '''
+import sys
+before = set(sys.modules)
+import index
+imported = len(set(sys.modules) - before)
+index.handler({'httpMethod': 'OPTIONS'}, None)
+import json
+print(json.dumps([imported, sorted(m for m in %r if m in sys.modules)]))
+'''
+
+def measure(function: str) -> Tuple[int, float, List[str]]:
+    '''
+    Returns the number of modules `import index` loads, its best cumulative
+    import time in milliseconds and the deferred modules found loaded after a
+    preflight.
+    '''
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    best_us = None
+    imported = 0
+    loaded: List[str] = []
+    for _ in range(RUNS):
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', PROBE % (DEFERRED_MODULES.get(function, []),)],
+            cwd=os.path.join(BACKEND_DIR, function),
+            env=env,
+            capture_output=True,
+            text=True
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f'{function}: import failed\n{proc.stderr}')
+        for line in proc.stderr.splitlines():
+            parts = [part.strip() for part in line.split('|')]
+            if len(parts) == 3 and parts[2] == 'index':
+                cumulative_us = int(parts[1])
+                best_us = cumulative_us if best_us is None else min(best_us, cumulative_us)
+        imported, loaded = json.loads(proc.stdout.strip().splitlines()[-1])
+    return imported, best_us / 1000, loaded
+
+def check_budgets() -> Dict[str, List[str]]:
+    '''Returns budget violations per function; empty when all are within budget.'''
+    violations: Dict[str, List[str]] = {}
+    functions = sorted(
+        name for name in os.listdir(BACKEND_DIR)
+        if os.path.isfile(os.path.join(BACKEND_DIR, name, 'index.py'))
+    )
+    for function in functions:
+        problems = []
+        if function not in IMPORT_BUDGETS_MODULES:
+            problems.append('no import budget configured')
+        else:
+            imported, elapsed_ms, loaded = measure(function)
+            budget = IMPORT_BUDGETS_MODULES[function]
+            print(f'{function:<14} {imported:3d} modules (budget {budget})  {elapsed_ms:7.1f} ms')
+            if imported > budget:
+                problems.append(f'import loaded {imported} modules, budget is {budget}')
+            if loaded:
+                problems.append(f'preflight loaded deferred modules: {", ".join(loaded)}')
+        if problems:
+            violations[function] = problems
+    return violations
+
+def main() -> int:
+    violations = check_budgets()
+    for function, problems in violations.items():
+        for problem in problems:
+            print(f'FAIL {function}: {problem}', file=sys.stderr)
+    return 1 if violations else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { Dialog, DialogContent, DialogDescription, DialogFooter, DialogHeader, DialogTitle } from '@/components/ui/dialog';
 import { Button } from '@/components/ui/button';
 import { Input } from '@/components/ui/input';
@@ -28,6 +28,7 @@ const OrderDialog = ({ open, onOpenChange, onSuccess }: OrderDialogProps) => {
   const [products, setProducts] = useState<Product[]>([]);
   const [searchQuery, setSearchQuery] = useState('');
   const [orderItems, setOrderItems] = useState<OrderItem[]>([]);
+  const idempotencyKey = useRef(crypto.randomUUID());
   const { toast } = useToast();
 
   const [formData, setFormData] = useState({
@@ -45,6 +46,10 @@ const OrderDialog = ({ open, onOpenChange, onSuccess }: OrderDialogProps) => {
     }
   }, [open]);
 
+  useEffect(() => {
+    idempotencyKey.current = crypto.randomUUID();
+  }, [open, formData, orderItems]);
+
   const loadProducts = async () => {
     try {
       const data = await api.getProducts({ pageSize: 100 });
@@ -146,7 +151,7 @@ const OrderDialog = ({ open, onOpenChange, onSuccess }: OrderDialogProps) => {
           unitPrice: item.unitPrice,
           purchasePrice: item.purchasePrice,
         })),
-      });
+      }, idempotencyKey.current);
 
       toast({
         title: 'Заказ создан',
@@ -20,6 +20,7 @@ const ProductDialog = ({ open, onOpenChange, product, onSuccess }: ProductDialog
   const [uploadingImage, setUploadingImage] = useState(false);
   const [imagePreview, setImagePreview] = useState<string | null>(null);
   const fileInputRef = useRef<HTMLInputElement>(null);
+  const idempotencyKey = useRef(crypto.randomUUID());
   const { toast } = useToast();
 
   const [formData, setFormData] = useState({
@@ -55,6 +56,10 @@ const ProductDialog = ({ open, onOpenChange, product, onSuccess }: ProductDialog
     }
   }, [open, product]);
 
+  useEffect(() => {
+    idempotencyKey.current = crypto.randomUUID();
+  }, [open, formData]);
+
   const resetForm = () => {
     setFormData({
       vendorCode: '',
@@ -137,7 +142,7 @@ const ProductDialog = ({ open, onOpenChange, product, onSuccess }: ProductDialog
           description: 'Информация о товаре успешно обновлена',
         });
       } else {
-        await api.createProduct(data);
+        await api.createProduct(data, idempotencyKey.current);
         toast({
           title: 'Товар создан',
           description: 'Новый товар успешно добавлен в каталог',
@@ -70,9 +70,11 @@ class ApiClient {
     search?: string;
     page?: number;
     pageSize?: number;
+    since?: string;
   }): Promise<ProductsResponse> {
     const queryParams = new URLSearchParams();
     if (params?.search) queryParams.append('search', params.search);
+    if (params?.since) queryParams.append('since', params.since);
     if (params?.page) queryParams.append('page', params.page.toString());
     if (params?.pageSize) queryParams.append('pageSize', params.pageSize.toString());
 
@@ -80,9 +82,13 @@ class ApiClient {
     return this.request<ProductsResponse>(url);
   }
 
-  async createProduct(product: CreateProductRequest): Promise<{ id: number }> {
+  async createProduct(
+    product: CreateProductRequest,
+    idempotencyKey: string = crypto.randomUUID()
+  ): Promise<{ id: number }> {
     return this.request<{ id: number }>(URLS.products, {
       method: 'POST',
+      headers: { 'Idempotency-Key': idempotencyKey },
       body: JSON.stringify(product),
     });
   }
@@ -108,8 +114,10 @@ class ApiClient {
   async getOrders(params?: {
     page?: number;
     pageSize?: number;
+    since?: string;
   }): Promise<OrdersResponse> {
     const queryParams = new URLSearchParams();
+    if (params?.since) queryParams.append('since', params.since);
     if (params?.page) queryParams.append('page', params.page.toString());
     if (params?.pageSize) queryParams.append('pageSize', params.pageSize.toString());
 
@@ -117,9 +125,13 @@ class ApiClient {
     return this.request<OrdersResponse>(url);
   }
 
-  async createOrder(order: CreateOrderRequest): Promise<{ id: number }> {
+  async createOrder(
+    order: CreateOrderRequest,
+    idempotencyKey: string = crypto.randomUUID()
+  ): Promise<{ id: number }> {
     return this.request<{ id: number }>(URLS.orders, {
       method: 'POST',
+      headers: { 'Idempotency-Key': idempotencyKey },
       body: JSON.stringify(order),
     });
   }
@@ -189,12 +201,20 @@ export interface ProductLocation {
   lastUpdatedUtc: string;
 }
 
+export interface ProductTombstone {
+  id: number;
+  isArchive: true;
+  modifiedOnUtc: string;
+}
+
 export interface ProductsResponse {
   products: Product[];
   total: number;
-  page: number;
-  pageSize: number;
-  totalPages: number;
+  page?: number;
+  pageSize?: number;
+  totalPages?: number;
+  deleted?: ProductTombstone[];
+  syncToken: string;
 }
 
 export interface CreateProductRequest {
@@ -227,6 +247,7 @@ export interface Order {
   status: string;
   createdOnUtc: string;
   completedOnUtc: string | null;
+  modifiedOnUtc: string;
   products: OrderProduct[];
 }
 
@@ -244,9 +265,10 @@ export interface OrderProduct {
 export interface OrdersResponse {
   orders: Order[];
   total: number;
-  page: number;
-  pageSize: number;
-  totalPages: number;
+  page?: number;
+  pageSize?: number;
+  totalPages?: number;
+  syncToken: string;
 }
 
 export interface CreateOrderRequest {
@@ -0,0 +1,113 @@
+'''
+Shared fixtures for the database-backed tests. They need a disposable
+PostgreSQL database in TEST_DATABASE_URL; every test session applies
+db_migrations into a fresh schema there and drops it afterwards.
+'''
+
+import glob
+import importlib.util
+import json
+import os
+import sys
+import uuid
+from typing import Any, Dict, Iterator, List, Tuple
+
+import pytest
+
+psycopg2 = pytest.importorskip('psycopg2')
+from psycopg2.extensions import make_dsn
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIGRATIONS = sorted(glob.glob(os.path.join(ROOT, 'db_migrations', 'V*.sql')))
+
+def migrate_schema(dsn: str) -> str:
+    '''
+    Applies every migration into a new schema and returns a DSN whose
+    search_path points at it.
+    '''
+    schema = f'test_{uuid.uuid4().hex[:12]}'
+    conn = psycopg2.connect(dsn)
+    conn.autocommit = True
+    cur = conn.cursor()
+    cur.execute(f'CREATE SCHEMA {schema}')
+    cur.execute(f'SET search_path = {schema}')
+    for path in MIGRATIONS:
+        with open(path, encoding='utf-8') as f:
+            cur.execute(f.read())
+    cur.close()
+    conn.close()
+    return make_dsn(dsn, options=f'-c search_path={schema}')
+
+def drop_schema(dsn: str) -> None:
+    conn = psycopg2.connect(dsn)
+    conn.autocommit = True
+    cur = conn.cursor()
+    cur.execute('SELECT current_schema()')
+    cur.execute(f'DROP SCHEMA {cur.fetchone()[0]} CASCADE')
+    cur.close()
+    conn.close()
+
+def load_function(name: str) -> Any:
+    '''
+    Imports backend/<name>/index.py as a fresh module, the way the platform
+    loads a function from its own directory.
+    '''
+    function_dir = os.path.join(ROOT, 'backend', name)
+    sys.path.insert(0, function_dir)
+    try:
+        spec = importlib.util.spec_from_file_location(f'{name}_index_{uuid.uuid4().hex}', os.path.join(function_dir, 'index.py'))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    finally:
+        sys.path.remove(function_dir)
+
+def plan_nodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from plan_nodes(child)
+
+def explain(db, query: str, params: Tuple = ()) -> List[Dict[str, Any]]:
+    '''
+    Returns the flattened plan of query with sequential scans disabled, so the
+    planner falls back to one only when no usable index exists.
+    '''
+    cur = db.cursor()
+    cur.execute('SET LOCAL enable_seqscan = off')
+    cur.execute(f'EXPLAIN (FORMAT JSON) {query}', params)
+    raw = cur.fetchone()[0]
+    cur.close()
+    plan = raw if isinstance(raw, list) else json.loads(raw)
+    return list(plan_nodes(plan[0]['Plan']))
+
+def assert_uses_index(nodes: List[Dict[str, Any]], relation: str, indexes: Tuple[str, ...]) -> None:
+    seq_scans = [n for n in nodes if n['Node Type'] == 'Seq Scan' and n.get('Relation Name') == relation]
+    assert not seq_scans, f'sequential scan on {relation}'
+    used = {n.get('Index Name') for n in nodes if 'Index' in n['Node Type']}
+    assert used & set(indexes), f'none of {indexes} used, plan indexes: {sorted(i for i in used if i)}'
+
+@pytest.fixture(scope='session')
+def database_url() -> str:
+    dsn = os.environ.get('TEST_DATABASE_URL')
+    if not dsn:
+        pytest.skip('TEST_DATABASE_URL is not set')
+    return dsn
+
+@pytest.fixture(scope='session')
+def migrated_dsn(database_url):
+    dsn = migrate_schema(database_url)
+    yield dsn
+    drop_schema(dsn)
+
+@pytest.fixture
+def db(migrated_dsn):
+    conn = psycopg2.connect(migrated_dsn)
+    yield conn
+    conn.rollback()
+    conn.close()
+
+@pytest.fixture
+def warehouse(migrated_dsn, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', migrated_dsn)
+    monkeypatch.delenv('DATABASE_READ_URL', raising=False)
+    return load_function('warehouse')
@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+from conftest import psycopg2
+
+def get(warehouse, **params):
+    response = warehouse.handler({'httpMethod': 'GET', 'queryStringParameters': params}, None)
+    return response['statusCode'], json.loads(response['body'])
+
+def test_write_committed_after_poll_is_not_skipped(warehouse, migrated_dsn):
+    writer = psycopg2.connect(migrated_dsn)
+    cur = writer.cursor()
+    cur.execute("UPDATE products SET price = price + 1 WHERE id = 'PRD-0004'")
+    
+    other = psycopg2.connect(migrated_dsn)
+    other.cursor().execute("UPDATE products SET price = price + 1 WHERE id = 'PRD-0001'")
+    other.commit()
+    other.close()
+    
+    status, first = get(warehouse, action='products')
+    assert status == 200
+    
+    writer.commit()
+    writer.close()
+    
+    status, delta = get(warehouse, action='products', since=first['syncToken'])
+    assert status == 200
+    assert 'PRD-0004' in [p['id'] for p in delta['products']]
+
+def test_archived_product_is_tombstone(warehouse, migrated_dsn):
+    status, first = get(warehouse, action='products')
+    
+    conn = psycopg2.connect(migrated_dsn)
+    cur = conn.cursor()
+    cur.execute("UPDATE products SET is_archive = TRUE WHERE id = 'PRD-0006'")
+    conn.commit()
+    
+    status, delta = get(warehouse, action='products', since=first['syncToken'])
+    cur.execute("UPDATE products SET is_archive = FALSE WHERE id = 'PRD-0006'")
+    conn.commit()
+    conn.close()
+    
+    assert [d['id'] for d in delta['deleted']] == ['PRD-0006']
+    assert 'PRD-0006' not in [p['id'] for p in delta['products']]
+
+def test_orders_feed(warehouse, migrated_dsn):
+    status, first = get(warehouse, action='orders')
+    assert status == 200
+    
+    conn = psycopg2.connect(migrated_dsn)
+    cur = conn.cursor()
+    cur.execute("UPDATE orders SET status = 'completed' WHERE id = 'ORD-2024-0002'")
+    conn.commit()
+    conn.close()
+    
+    status, delta = get(warehouse, action='orders', since=first['syncToken'])
+    assert status == 200
+    assert [o['id'] for o in delta['orders']] == ['ORD-2024-0002']
+    assert delta['syncToken'] >= first['syncToken']
+
+def test_order_line_changes_reach_orders_feed(warehouse, migrated_dsn):
+    status, first = get(warehouse, action='orders')
+    assert status == 200
+    items = {o['id']: o['items'] for o in first['orders']}
+    
+    conn = psycopg2.connect(migrated_dsn)
+    cur = conn.cursor()
+    cur.execute('''
+        INSERT INTO order_products (order_id, product_id, product_name, quantity, unit_price, total_price)
+        SELECT 'ORD-2024-0001', id, name, 1, price, price FROM products WHERE id = 'PRD-0002'
+        RETURNING id
+    ''')
+    line_id = cur.fetchone()[0]
+    conn.commit()
+    
+    status, added = get(warehouse, action='orders', since=first['syncToken'])
+    assert [(o['id'], o['items']) for o in added['orders']] == [('ORD-2024-0001', items['ORD-2024-0001'] + 1)]
+    
+    cur.execute('DELETE FROM order_products WHERE id = %s', (line_id,))
+    conn.commit()
+    conn.close()
+    
+    status, removed = get(warehouse, action='orders', since=added['syncToken'])
+    assert status == 200
+    assert [(o['id'], o['items']) for o in removed['orders']] == [('ORD-2024-0001', items['ORD-2024-0001'])]
+
+def test_invalid_since_is_rejected(warehouse):
+    status, body = get(warehouse, action='products', since='yesterday')
+    assert status == 400
+    assert body == {'error': 'Invalid since token'}
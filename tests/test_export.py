@@ -0,0 +1,37 @@
+import base64
+import gzip
+import json
+
+import pytest
+
+def export(warehouse, **params):
+    return warehouse.handler({'httpMethod': 'GET', 'queryStringParameters': {'action': 'export', **params}}, None)
+
+def test_pages_follow_cursor(warehouse, monkeypatch):
+    monkeypatch.setattr(warehouse, 'EXPORT_PAGE_SIZE', 2)
+    ids, cursor = [], None
+    while True:
+        params = {'entity': 'stock', 'format': 'ndjson'}
+        if cursor:
+            params['cursor'] = cursor
+        response = export(warehouse, **params)
+        assert response['statusCode'] == 200
+        assert response['headers']['Content-Type'] == 'application/gzip'
+        body = gzip.decompress(base64.b64decode(response['body'])).decode('utf-8')
+        ids += [json.loads(line)['id'] for line in body.splitlines()]
+        cursor = response['headers'].get('X-Export-Cursor')
+        if not cursor:
+            break
+
+    assert len(ids) > 2
+    assert ids == sorted(set(ids))
+
+@pytest.mark.parametrize('params', [
+    {'entity': 'stock', 'cursor': 'PRD-0001'},
+    {'entity': 'suppliers'},
+    {'format': 'xml'}
+])
+def test_invalid_export_params_are_rejected(warehouse, params):
+    response = export(warehouse, **params)
+    assert response['statusCode'] == 400
+    assert 'error' in json.loads(response['body'])
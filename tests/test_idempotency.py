@@ -0,0 +1,131 @@
+import importlib.util
+import json
+import os
+import sys
+import uuid
+
+import pytest
+
+from conftest import ROOT, load_function
+
+@pytest.fixture
+def idempotency(migrated_dsn, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', migrated_dsn)
+    path = os.path.join(ROOT, 'backend', 'orders', 'idempotency.py')
+    spec = importlib.util.spec_from_file_location(f'idempotency_{uuid.uuid4().hex}', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def post(key, body='{}'):
+    return {'httpMethod': 'POST', 'headers': {'Idempotency-Key': key}, 'body': body}
+
+def respond(status_code, payload):
+    calls = []
+
+    def execute():
+        calls.append(1)
+        return {'statusCode': status_code, 'headers': {}, 'body': json.dumps(payload), 'isBase64Encoded': False}
+
+    return execute, calls
+
+def seconds_left(db, cache_key):
+    cur = db.cursor()
+    cur.execute('SELECT EXTRACT(EPOCH FROM expires_on_utc - NOW()) FROM idempotency_keys WHERE key = %s', (cache_key,))
+    row = cur.fetchone()
+    db.commit()
+    return float(row[0]) if row else None
+
+def test_claim_gets_lease_and_store_extends_to_ttl(idempotency, db):
+    key = uuid.uuid4().hex
+    leases = []
+
+    def execute():
+        leases.append(seconds_left(db, f'orders:{key}'))
+        return {'statusCode': 201, 'headers': {}, 'body': '{}', 'isBase64Encoded': False}
+
+    idempotency.with_idempotency(post(key), 'orders', execute)
+
+    assert leases[0] <= idempotency.IDEMPOTENCY_LEASE_SECONDS
+    assert seconds_left(db, f'orders:{key}') > idempotency.IDEMPOTENCY_TTL_SECONDS - 60
+
+def test_server_error_releases_key(idempotency):
+    key = uuid.uuid4().hex
+
+    failing, _ = respond(500, {'error': 'boom'})
+    assert idempotency.with_idempotency(post(key), 'orders', failing)['statusCode'] == 500
+
+    retry, calls = respond(201, {'id': 'ORD-1'})
+    assert idempotency.with_idempotency(post(key), 'orders', retry)['statusCode'] == 201
+    assert calls == [1]
+
+def test_crashed_attempt_is_locked_until_lease_expires(idempotency, db):
+    key = uuid.uuid4().hex
+    idempotency.IDEMPOTENCY_WAIT_SECONDS = 0
+
+    def crash():
+        raise RuntimeError('container died')
+
+    with pytest.raises(RuntimeError):
+        idempotency.with_idempotency(post(key), 'orders', crash)
+
+    retry, calls = respond(201, {'id': 'ORD-1'})
+    assert idempotency.with_idempotency(post(key), 'orders', retry)['statusCode'] == 409
+    assert calls == []
+
+    cur = db.cursor()
+    cur.execute("UPDATE idempotency_keys SET expires_on_utc = NOW() - INTERVAL '1 second' WHERE key = %s", (f'orders:{key}',))
+    db.commit()
+
+    assert idempotency.with_idempotency(post(key), 'orders', retry)['statusCode'] == 201
+    assert calls == [1]
+
+def test_database_errors_fall_back_to_memory(idempotency, db):
+    key = uuid.uuid4().hex
+    cur = db.cursor()
+    cur.execute('ALTER TABLE idempotency_keys RENAME TO idempotency_keys_moved')
+    db.commit()
+    try:
+        execute, calls = respond(201, {'id': 'ORD-1'})
+        first = idempotency.with_idempotency(post(key), 'orders', execute)
+        second = idempotency.with_idempotency(post(key), 'orders', execute)
+    finally:
+        cur.execute('ALTER TABLE idempotency_keys_moved RENAME TO idempotency_keys')
+        db.commit()
+
+    assert first['statusCode'] == 201
+    assert second['headers']['Idempotent-Replayed'] == 'true'
+    assert calls == [1]
+
+@pytest.fixture
+def upload_image(migrated_dsn, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', migrated_dsn)
+    monkeypatch.syspath_prepend(os.path.join(ROOT, 'backend', 'upload-image'))
+    monkeypatch.delitem(sys.modules, 'idempotency', raising=False)
+    return load_function('upload-image')
+
+def test_upload_replay_keeps_url(upload_image, db, monkeypatch):
+    key = uuid.uuid4().hex
+    event = post(key, json.dumps({'image': 'data:image/png;base64,' + 'A' * 10000, 'filename': 'a.png'}))
+
+    first = upload_image.handler(event, None)
+    same_container = upload_image.handler(event, None)
+    monkeypatch.delitem(sys.modules, 'idempotency')
+    other_container = upload_image.handler(event, None)
+
+    assert first['statusCode'] == 200
+    for replayed in (same_container, other_container):
+        assert replayed['headers']['Idempotent-Replayed'] == 'true'
+        assert json.loads(replayed['body']) == json.loads(first['body'])
+
+    cur = db.cursor()
+    cur.execute('SELECT response FROM idempotency_keys WHERE key = %s', (f'upload-image:{key}',))
+    assert json.loads(json.loads(cur.fetchone()[0])['body']) == {'id': json.loads(first['body'])['id']}
+    db.commit()
+
+def test_function_copies_are_identical():
+    copies = {}
+    for function in ('orders', 'products', 'upload-image'):
+        with open(os.path.join(ROOT, 'backend', function, 'idempotency.py'), 'rb') as f:
+            copies[function] = f.read()
+    assert len(set(copies.values())) == 1, f'idempotency.py differs between {sorted(copies)}'
@@ -0,0 +1,13 @@
+import importlib.util
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load_import_budget():
+    spec = importlib.util.spec_from_file_location('import_budget', os.path.join(ROOT, 'scripts', 'import_budget.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def test_functions_within_import_budget():
+    assert load_import_budget().check_budgets() == {}
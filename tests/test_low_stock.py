@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from conftest import psycopg2
+
+def get(warehouse, **params):
+    response = warehouse.handler({'httpMethod': 'GET', 'queryStringParameters': {'action': 'lowStock', **params}}, None)
+    return response['statusCode'], json.loads(response['body'])
+
+def test_low_stock_follows_stock_changes(warehouse, migrated_dsn):
+    status, body = get(warehouse)
+    assert status == 200
+    assert {item['id'] for item in body['lowStock']} == {'PRD-0003', 'PRD-0005'}
+    
+    conn = psycopg2.connect(migrated_dsn)
+    cur = conn.cursor()
+    cur.execute("UPDATE product_locations SET quantity = 40 WHERE product_id = 'PRD-0003'")
+    cur.execute("INSERT INTO product_locations (product_id, location_id, quantity) VALUES ('PRD-0004', 2, 0)")
+    cur.execute("UPDATE products SET min_stock_level = 20 WHERE id = 'PRD-0004'")
+    conn.commit()
+    
+    status, body = get(warehouse)
+    
+    cur.execute("DELETE FROM product_locations WHERE product_id = 'PRD-0004' AND location_id = 2")
+    cur.execute("UPDATE product_locations SET quantity = 8 WHERE product_id = 'PRD-0003'")
+    cur.execute("UPDATE products SET min_stock_level = 5 WHERE id = 'PRD-0004'")
+    conn.commit()
+    conn.close()
+    
+    assert {item['id'] for item in body['lowStock']} == {'PRD-0004', 'PRD-0005'}
+
+def test_low_stock_per_location(warehouse):
+    status, body = get(warehouse, locationId='1', coverDays='0')
+    assert status == 200
+    items = {item['id']: item for item in body['lowStock']}
+    assert set(items) == {'PRD-0005'}
+    assert items['PRD-0005']['stock'] == 0
+    assert items['PRD-0005']['reorder_quantity'] == 15
+
+def test_reorder_quantity_uses_sales_velocity(warehouse, migrated_dsn):
+    conn = psycopg2.connect(migrated_dsn)
+    cur = conn.cursor()
+    cur.execute('''
+        INSERT INTO order_products (order_id, product_id, product_name, quantity, unit_price, total_price)
+        VALUES ('ORD-2024-0002', 'PRD-0005', 'Мышь Logitech', 30, 1200, 36000)
+    ''')
+    conn.commit()
+    
+    status, body = get(warehouse, days='30', coverDays='14')
+    
+    cur.execute("DELETE FROM order_products WHERE order_id = 'ORD-2024-0002' AND product_id = 'PRD-0005'")
+    conn.commit()
+    conn.close()
+    
+    item = next(item for item in body['lowStock'] if item['id'] == 'PRD-0005')
+    assert item['daily_velocity'] == 1.0
+    assert item['reorder_quantity'] == 14 + 15 - 0
+
+@pytest.mark.parametrize('params', [{'days': 'week'}, {'coverDays': '1.5'}, {'locationId': 'main'}, {'days': '0'}])
+def test_invalid_params_are_rejected(warehouse, params):
+    status, body = get(warehouse, **params)
+    assert status == 400
+    assert 'error' in body
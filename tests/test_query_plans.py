@@ -0,0 +1,104 @@
+'''
+EXPLAIN-based checks that the warehouse actions' hot queries are served by
+the indexes from db_migrations rather than sequential scans. The SQL is
+recorded from query_action itself, so the plans are those of the queries
+the handler actually runs. Sequential scans are disabled so the planner
+falls back to one only when no usable index exists, which keeps the
+assertions independent of table size.
+'''
+
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+from conftest import assert_uses_index, explain
+
+class RecordingCursor:
+    def __init__(self, cursor, executed: List[Tuple[str, Tuple]]):
+        self._cursor = cursor
+        self._executed = executed
+
+    def execute(self, query, params=None):
+        self._executed.append((query, params or ()))
+        return self._cursor.execute(query, params)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+class RecordingConnection:
+    def __init__(self, conn):
+        self._conn = conn
+        self.executed: List[Tuple[str, Tuple]] = []
+
+    def cursor(self, *args, **kwargs):
+        return RecordingCursor(self._conn.cursor(*args, **kwargs), self.executed)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+def action_queries(warehouse, action: str, params: Dict[str, Any], low_stock_args=None) -> List[Tuple[str, Tuple]]:
+    conn = RecordingConnection(warehouse.get_db_connection())
+    try:
+        warehouse.query_action(conn, action, params, low_stock_args)
+    finally:
+        conn.close()
+    return [(query, args) for query, args in conn.executed if query != warehouse.SYNC_TOKEN_QUERY]
+
+@pytest.fixture
+def recent_since(db) -> str:
+    cur = db.cursor()
+    cur.execute('ANALYZE products')
+    cur.execute('ANALYZE orders')
+    cur.execute("SELECT (NOW() + INTERVAL '1 minute')::timestamp::text")
+    since = cur.fetchone()[0]
+    cur.close()
+    db.commit()
+    return since
+
+HOT_ACTIONS = [
+    (
+        'recent orders',
+        'orders', {}, None,
+        {'orders': ('idx_orders_date', 'idx_orders_date_status'), 'order_products': ('idx_order_products_order',)}
+    ),
+    (
+        'orders feed',
+        'orders', {'since': None}, None,
+        {'orders': ('idx_orders_updated',), 'order_products': ('idx_order_products_order',)}
+    ),
+    (
+        'products feed',
+        'products', {'since': None}, None,
+        {'products': ('idx_products_updated',)}
+    ),
+    (
+        'low stock',
+        'lowStock', {}, (None, 30, 14),
+        {'product_stock': ('idx_product_stock_low',), 'order_products': ('idx_order_products_product_created',)}
+    ),
+    (
+        'low stock at location',
+        'lowStock', {'locationId': '1'}, (1, 30, 14),
+        {'product_locations': ('idx_product_locations_location',), 'order_products': ('idx_order_products_product_created',)}
+    )
+]
+
+@pytest.mark.parametrize(
+    'action, params, low_stock_args, expected',
+    [case[1:] for case in HOT_ACTIONS],
+    ids=[case[0] for case in HOT_ACTIONS]
+)
+def test_hot_action_uses_index(warehouse, db, recent_since, action, params, low_stock_args, expected):
+    if 'since' in params:
+        params = {**params, 'since': recent_since}
+    queries = action_queries(warehouse, action, params, low_stock_args)
+    assert len(queries) == 1
+    nodes = explain(db, *queries[0])
+    for relation, indexes in expected.items():
+        assert_uses_index(nodes, relation, indexes)
+
+def test_migrated_order_lines_keep_unknown_cost(db):
+    cur = db.cursor()
+    cur.execute('SELECT COUNT(*) FROM order_products WHERE purchase_price IS NULL AND profit IS NULL')
+    assert cur.fetchone()[0] == 6
+    cur.close()
@@ -0,0 +1,93 @@
+'''
+Read routing against two databases: TEST_DATABASE_URL plays the primary and
+TEST_DATABASE_READ_URL the replica. Both get the same migrations; the replica
+copy renames one product so each response shows which side served it.
+'''
+
+import json
+import os
+import time
+
+import pytest
+
+from conftest import drop_schema, load_function, migrate_schema, psycopg2
+from psycopg2.extensions import make_dsn, parse_dsn
+
+REPLICA_MARKER = 'Replica marker'
+
+@pytest.fixture(scope='module')
+def replica_dsn():
+    dsn = os.environ.get('TEST_DATABASE_READ_URL')
+    if not dsn:
+        pytest.skip('TEST_DATABASE_READ_URL is not set')
+    migrated = migrate_schema(dsn)
+    conn = psycopg2.connect(migrated)
+    conn.cursor().execute("UPDATE products SET name = %s WHERE id = 'PRD-0001'", (REPLICA_MARKER,))
+    conn.commit()
+    conn.close()
+    yield migrated
+    drop_schema(migrated)
+
+def with_lock_timeout(dsn: str) -> str:
+    options = parse_dsn(dsn).get('options', '')
+    return make_dsn(dsn, options=f'{options} -c lock_timeout=200')
+
+def load_warehouse(monkeypatch, primary: str, replicas: str):
+    monkeypatch.setenv('DATABASE_URL', primary)
+    monkeypatch.setenv('DATABASE_READ_URL', replicas)
+    return load_function('warehouse')
+
+def served_by_replica(warehouse, **params) -> bool:
+    params = {'action': 'products', 'search': REPLICA_MARKER, **params}
+    response = warehouse.handler({'httpMethod': 'GET', 'queryStringParameters': params}, None)
+    assert response['statusCode'] == 200
+    return bool(json.loads(response['body'])['products'])
+
+def test_reads_go_to_replica(monkeypatch, migrated_dsn, replica_dsn):
+    warehouse = load_warehouse(monkeypatch, migrated_dsn, replica_dsn)
+
+    assert served_by_replica(warehouse)
+    assert not served_by_replica(warehouse, consistency='primary')
+    assert not served_by_replica(warehouse, since='2000-01-01T00:00:00')
+
+def test_unreachable_replica_is_ejected(monkeypatch, migrated_dsn, replica_dsn):
+    unreachable = 'host=localhost port=1 dbname=postgres'
+    warehouse = load_warehouse(monkeypatch, migrated_dsn, f'{unreachable},{replica_dsn}')
+
+    assert served_by_replica(warehouse)
+    assert served_by_replica(warehouse)
+    assert warehouse.replica_health[unreachable]['failures'] == 1
+    assert warehouse.replica_health[unreachable]['ejected_until'] > time.monotonic()
+
+@pytest.fixture
+def locked_replica(replica_dsn):
+    '''
+    Holds an ACCESS EXCLUSIVE lock on the replica's products table, so replica
+    queries fail with LockNotAvailable once their lock_timeout runs out.
+    '''
+    conn = psycopg2.connect(replica_dsn)
+    conn.cursor().execute('LOCK TABLE products IN ACCESS EXCLUSIVE MODE')
+    yield with_lock_timeout(replica_dsn)
+    conn.rollback()
+    conn.close()
+
+def test_failed_replica_query_falls_back_to_primary(monkeypatch, migrated_dsn, locked_replica):
+    warehouse = load_warehouse(monkeypatch, migrated_dsn, locked_replica)
+
+    assert not served_by_replica(warehouse)
+    assert warehouse.replica_health[locked_replica]['ejected_until'] > time.monotonic()
+    assert not served_by_replica(warehouse)
+    assert warehouse.replica_health[locked_replica]['failures'] == 1
+
+def test_failed_replica_export_falls_back_to_primary(monkeypatch, migrated_dsn, locked_replica):
+    warehouse = load_warehouse(monkeypatch, migrated_dsn, locked_replica)
+
+    response = warehouse.handler({
+        'httpMethod': 'GET',
+        'queryStringParameters': {'action': 'export', 'entity': 'products', 'format': 'ndjson', 'gzip': '0'}
+    }, None)
+
+    assert response['statusCode'] == 200
+    names = [json.loads(line)['name'] for line in response['body'].splitlines()]
+    assert names and REPLICA_MARKER not in names
+    assert warehouse.replica_health[locked_replica]['failures'] == 1